@@ -88,10 +88,16 @@ class ContinuousDataEncoder:
 
     @validate_arguments(config=dict(arbitrary_types_allowed=True))
     def inverse_transform(self, X: pd.DataFrame) -> pd.Series:
-        normalized = np.clip(X.values[:, 0], -1, 1)
+        return self.inverse_transform_array(X.values[:, 0], X.values[:, 1])
+
+    def inverse_transform_array(
+        self, normalized: np.ndarray, components: np.ndarray
+    ) -> np.ndarray:
+        """Inverse transform from the arrays of normalized values and selected components."""
+        normalized = np.clip(normalized, -1, 1)
         means = self.model.means_.reshape([-1])
         stds = np.sqrt(self.model.covariances_).reshape([-1])
-        selected_component = X.values[:, 1].astype(int)
+        selected_component = components.astype(int)
 
         # recreate data
         std_t = stds[selected_component]
@@ -1,5 +1,5 @@
 # stdlib
-from typing import Any, Optional, Tuple
+from typing import Any, Callable, Generator, Optional, Tuple
 
 # third party
 import numpy as np
@@ -19,6 +19,7 @@ from nflows.transforms.coupling import (
     PiecewiseQuadraticCouplingTransform,
     PiecewiseRationalQuadraticCouplingTransform,
 )
+from nflows.transforms.linear import Linear
 from nflows.transforms.lu import LULinear
 from nflows.transforms.permutations import RandomPermutation
 from nflows.transforms.svd import SVDLinear
@@ -28,6 +29,7 @@ from torch.utils.data import DataLoader, TensorDataset
 from tqdm import tqdm
 
 # synthcity absolute
+import synthcity.logger as log
 from synthcity.metrics.weighted_metrics import WeightedMetrics
 from synthcity.utils.constants import DEVICE
 
@@ -101,6 +103,12 @@ class NormalizingFlows(nn.Module):
             Max number of iterations without any improvement before early stopping is trigged.
         patience_metric: Optional[WeightedMetrics]
             If not None, the metric is used for evaluation the criterion for early stopping.
+        compile_model: bool
+            Compile the training graph on CUDA devices. Requires PyTorch >= 2.0. Disabled by default, the nflows transforms being captured as many small graphs.
+        mixed_precision: str
+            Mixed precision training mode: "none", "bf16" or "fp16". Only used by the affine transforms.
+        dataloader_kwargs: Optional[dict]
+            Extra arguments for the training `torch.utils.data.DataLoader`, e.g. `num_workers` or `pin_memory`. If set, the dataset is kept on the host and copied to the device per minibatch. `batch_size` is set by the model.
     """
 
     def __init__(
@@ -125,8 +133,18 @@ class NormalizingFlows(nn.Module):
         n_iter_print: int = 10,
         patience: int = 20,
         patience_metric: Optional[WeightedMetrics] = None,
+        compile_model: bool = False,
+        mixed_precision: str = "none",  # "none", "bf16", "fp16"
+        dataloader_kwargs: Optional[dict] = None,
     ) -> None:
         super(NormalizingFlows, self).__init__()
+        if mixed_precision not in ["none", "bf16", "fp16"]:
+            raise ValueError(f"Unknown mixed precision mode {mixed_precision}")
+        if dataloader_kwargs is not None and "batch_size" in dataloader_kwargs:
+            raise ValueError(
+                "dataloader_kwargs cannot set batch_size, use the batch_size argument"
+            )
+
         self.device = device
         self.n_iter = n_iter
         self.n_layers_hidden = n_layers_hidden
@@ -148,10 +166,18 @@ class NormalizingFlows(nn.Module):
         self.n_iter_min = n_iter_min
         self.patience = patience
         self.patience_metric = patience_metric
+        self.compile_model = compile_model
+        self.mixed_precision = mixed_precision
+        self.dataloader_kwargs = dataloader_kwargs if dataloader_kwargs else {}
 
     def dataloader(self, X: torch.Tensor) -> DataLoader:
-        dataset = TensorDataset(X)
-        return DataLoader(dataset, batch_size=self.batch_size, pin_memory=False)
+        # Custom loaders (workers, pinned memory) read the dataset from the host,
+        # and the minibatches are copied to the device asynchronously.
+        kwargs: dict = {"pin_memory": torch.device(self.device).type == "cuda"}
+        kwargs.update(self.dataloader_kwargs)
+
+        dataset = TensorDataset(X.cpu())
+        return DataLoader(dataset, batch_size=self.batch_size, **kwargs)
 
     def generate(self, count: int) -> np.ndarray:
         return self(count).detach().cpu().numpy()
@@ -218,7 +244,9 @@ class NormalizingFlows(nn.Module):
         X = self._check_tensor(X).float().to(self.device)
         X, X_val = self._train_test_split(X)
 
-        loader = self.dataloader(X)
+        # Custom loaders are built once, so the workers and the host copy of the
+        # dataset are reused across epochs.
+        loader = self.dataloader(X) if len(self.dataloader_kwargs) > 0 else None
 
         # Prepare flow
         features = X.shape[1]
@@ -231,6 +259,14 @@ class NormalizingFlows(nn.Module):
         # Prepare optimizer
         optimizer = optim.Adam(self.flow.parameters(), lr=self.lr)
 
+        # The compiled function is kept local, so the model remains serializable.
+        log_prob = self._training_log_prob()
+
+        # Mixed precision. The log-det accumulators are allocated from the fp32
+        # inputs, so they stay in fp32. Only fp16 needs loss scaling.
+        autocast_dtype = self._autocast_dtype()
+        scaler = self._grad_scaler() if autocast_dtype == torch.float16 else None
+
         # Train
         patience_score = self._init_patience_score()
         patience = 0
@@ -238,14 +274,25 @@ class NormalizingFlows(nn.Module):
 
         for it in tqdm(range(self.n_iter)):
             self.train()
-            for _, data in enumerate(loader):
+            for batch in self._minibatches(X, loader):
                 optimizer.zero_grad()
-                loss = -self.flow.log_prob(inputs=data[0]).mean()
+                with torch.autocast(
+                    device_type=torch.device(self.device).type,
+                    dtype=autocast_dtype,
+                    enabled=autocast_dtype is not None,
+                ):
+                    log_likelihood = log_prob(batch)
+                loss = -log_likelihood.float().mean()
                 if torch.isnan(loss).sum() != 0:
                     raise RuntimeError("The loss contains NaNs")
 
-                loss.backward()
-                optimizer.step()
+                if scaler is None:
+                    loss.backward()
+                    optimizer.step()
+                else:
+                    scaler.scale(loss).backward()
+                    scaler.step(optimizer)
+                    scaler.update()
 
             if (it + 1) % self.n_iter_print == 0:
                 self.eval()
@@ -262,6 +309,7 @@ class NormalizingFlows(nn.Module):
 
         if best_state_dict is not None:
             self.load_state_dict(best_state_dict)
+            self._invalidate_cache()
 
         return self
 
@@ -271,6 +319,64 @@ class NormalizingFlows(nn.Module):
         else:
             return torch.from_numpy(np.asarray(X)).to(self.device)
 
+    def _invalidate_cache(self) -> None:
+        for module in self.flow.modules():
+            if isinstance(module, Linear):
+                module.cache.invalidate()
+
+    def _autocast_dtype(self) -> Optional[torch.dtype]:
+        """Return the dtype used for mixed precision training, if any.
+
+        Mixed precision is only used for the affine transforms, the spline solves of the piecewise transforms being numerically unstable in half precision.
+        """
+        if self.mixed_precision == "none":
+            return None
+
+        if not self.base_transform_type.startswith("affine"):
+            log.info(
+                f"Mixed precision is not supported by {self.base_transform_type}. Training in fp32"
+            )
+            return None
+
+        if self.mixed_precision == "bf16":
+            return torch.bfloat16
+
+        return torch.float16
+
+    def _grad_scaler(self) -> Any:
+        if hasattr(torch, "amp") and hasattr(torch.amp, "GradScaler"):
+            return torch.amp.GradScaler(torch.device(self.device).type)
+
+        return torch.cuda.amp.GradScaler()
+
+    def _minibatches(self, X: torch.Tensor, loader: Optional[DataLoader]) -> Generator:
+        """Iterate over the training minibatches for one epoch.
+
+        Without a custom `loader`, the dataset stays on the device and is indexed with a random permutation, without any DataLoader overhead.
+        """
+        if loader is not None:
+            for data in loader:
+                yield data[0].to(self.device, non_blocking=True)
+            return
+
+        idx = torch.randperm(len(X), device=X.device)
+        for start in range(0, len(X), self.batch_size):
+            yield X[idx[start : start + self.batch_size]]
+
+    def _use_compile(self) -> bool:
+        return (
+            self.compile_model
+            and hasattr(torch, "compile")
+            and torch.device(self.device).type == "cuda"
+        )
+
+    def _training_log_prob(self) -> Callable:
+        """Return the log-likelihood function used by the training loop, compiled using `torch.compile` if enabled."""
+        if not self._use_compile():
+            return self.flow.log_prob
+
+        return torch.compile(self.flow.log_prob, mode="reduce-overhead", dynamic=False)
+
     def _get_base_distribution(self) -> Any:
         if self.base_distribution == "standard_normal":
             return StandardNormal
@@ -291,7 +397,14 @@ class NormalizingFlows(nn.Module):
             return CompositeTransform(
                 [
                     RandomPermutation(features=features),
-                    SVDLinear(features, num_householder=10, identity_init=True),
+                    # Cache the composed weights in eval mode: sampling reuses them
+                    # instead of replaying the Householder products on every call.
+                    SVDLinear(
+                        features,
+                        num_householder=10,
+                        identity_init=True,
+                        using_cache=True,
+                    ),
                 ]
             )
         else:
@@ -1,5 +1,4 @@
-"""TabularEncoder module.
-"""
+"""TabularEncoder module."""
 
 # stdlib
 from typing import Any, List, Optional, Sequence, Tuple
@@ -332,27 +331,21 @@ class TabularEncoder(TransformerMixin, BaseEstimator):
 
         return result
 
-    @validate_arguments(config=dict(arbitrary_types_allowed=True))
     def _inverse_transform_continuous(
         self,
         column_transform_info: FeatureInfo,
-        column_data: pd.DataFrame,
-    ) -> pd.DataFrame:
+        column_data: np.ndarray,
+    ) -> np.ndarray:
         encoder = column_transform_info.transform
-        data = pd.DataFrame(column_data.values[:, :2], columns=["value", "component"])
-        data.iloc[:, 1] = np.argmax(column_data.values[:, 1:], axis=1)
-        return encoder.inverse_transform(data)
+        return encoder.inverse_transform_array(
+            column_data[:, 0], np.argmax(column_data[:, 1:], axis=1)
+        )
 
-    @validate_arguments(config=dict(arbitrary_types_allowed=True))
     def _inverse_transform_discrete(
-        self, column_transform_info: FeatureInfo, column_data: pd.DataFrame
-    ) -> pd.DataFrame:
+        self, column_transform_info: FeatureInfo, column_data: np.ndarray
+    ) -> np.ndarray:
         ohe = column_transform_info.transform
-        column = column_transform_info.name
-        return pd.DataFrame(
-            ohe.inverse_transform(column_data),
-            columns=[column],
-        )
+        return ohe.inverse_transform(column_data)
 
     @validate_arguments(config=dict(arbitrary_types_allowed=True))
     def inverse_transform(self, data: pd.DataFrame) -> pd.DataFrame:
@@ -378,7 +371,7 @@ class TabularEncoder(TransformerMixin, BaseEstimator):
 
         for column_transform_info in self._column_transform_info_list:
             dim = column_transform_info.output_dimensions
-            column_data = data.iloc[:, list(range(st, st + dim))]
+            column_data = data.iloc[:, st : st + dim].values
             if column_transform_info.feature_type == "continuous":
                 recovered_column_data = self._inverse_transform_continuous(
                     column_transform_info, column_data
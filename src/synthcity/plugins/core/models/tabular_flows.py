@@ -2,6 +2,7 @@
 from typing import Any, Optional
 
 # third party
+import numpy as np
 import pandas as pd
 import torch
 from pydantic import validate_arguments
@@ -75,6 +76,12 @@ class TabularFlows(nn.Module):
             Max number of iterations without any improvement before early stopping is trigged.
         patience_metric: WeightedMetrics
             Metric evaluator
+        compile_model: bool
+            Compile the training graph on CUDA devices. Requires PyTorch >= 2.0. Disabled by default, the nflows transforms being captured as many small graphs.
+        mixed_precision: str
+            Mixed precision training mode: "none", "bf16" or "fp16". Only used by the affine transforms.
+        dataloader_kwargs: Optional[dict]
+            Extra arguments for the training `torch.utils.data.DataLoader`, e.g. `num_workers` or `pin_memory`. If set, the dataset is kept on the host and copied to the device per minibatch.
     """
 
     @validate_arguments(config=dict(arbitrary_types_allowed=True))
@@ -103,6 +110,9 @@ class TabularFlows(nn.Module):
         n_iter_print: int = 10,
         patience: int = 10,
         patience_metric: Optional[WeightedMetrics] = None,
+        compile_model: bool = False,
+        mixed_precision: str = "none",  # "none", "bf16", "fp16"
+        dataloader_kwargs: Optional[dict] = None,
     ) -> None:
         super(TabularFlows, self).__init__()
         self.columns = X.columns
@@ -130,6 +140,9 @@ class TabularFlows(nn.Module):
             n_iter_print=n_iter_print,
             patience=patience,
             patience_metric=patience_metric,
+            compile_model=compile_model,
+            mixed_precision=mixed_precision,
+            dataloader_kwargs=dataloader_kwargs,
         )
 
     @validate_arguments(config=dict(arbitrary_types_allowed=True))
@@ -154,10 +167,21 @@ class TabularFlows(nn.Module):
         )
         return self
 
-    def generate(self, count: int) -> pd.DataFrame:
-        samples = self.model.generate(count)
+    def decode_samples(self, samples: np.ndarray) -> pd.DataFrame:
+        """Decode the raw flow samples, as returned by `generate(count, as_numpy=True)`."""
         return self.decode(pd.DataFrame(samples))
 
+    def generate(self, count: int, as_numpy: bool = False) -> Any:
+        """Generate `count` samples.
+
+        If `as_numpy` is True, the encoded samples are returned as a numpy array and the decoding step is skipped.
+        """
+        samples = self.model.generate(count)
+        if as_numpy:
+            return samples
+
+        return self.decode_samples(samples)
+
     @validate_arguments(config=dict(arbitrary_types_allowed=True))
     def forward(self, count: int) -> torch.Tensor:
         return self.model.forward(count)
@@ -1,9 +1,12 @@
 # stdlib
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, List, Optional
+from typing import Any, List, Optional, Tuple
 
 # third party
+import numpy as np
 import pandas as pd
+import torch
 from pydantic import validate_arguments
 
 # synthcity absolute
@@ -22,6 +25,39 @@ from synthcity.plugins.core.schema import Schema
 from synthcity.utils.constants import DEVICE
 
 
+@lru_cache(maxsize=None)
+def _hyperparameter_space(cuda: bool) -> Tuple[Distribution, ...]:
+    """Build the hyperparameter space once per device type."""
+    # The SVD linear transform is much slower than LU or permutations on CUDA.
+    linear_transform_types = ["lu", "permutation"]
+    if not cuda:
+        linear_transform_types.append("svd")
+
+    return (
+        IntegerDistribution(name="n_iter", low=100, high=5000, step=100),
+        IntegerDistribution(name="n_layers_hidden", low=1, high=10),
+        IntegerDistribution(name="n_units_hidden", low=10, high=100),
+        CategoricalDistribution(name="batch_size", choices=[32, 64, 128, 256, 512]),
+        FloatDistribution(name="dropout", low=0, high=0.2),
+        CategoricalDistribution(name="batch_norm", choices=[True, False]),
+        CategoricalDistribution(name="lr", choices=[1e-3, 1e-4, 2e-4]),
+        CategoricalDistribution(
+            name="linear_transform_type", choices=linear_transform_types
+        ),
+        CategoricalDistribution(
+            name="base_transform_type",
+            choices=[
+                "affine-coupling",
+                "quadratic-coupling",
+                "rq-coupling",
+                "affine-autoregressive",
+                "quadratic-autoregressive",
+                "rq-autoregressive",
+            ],
+        ),
+    )
+
+
 class NormalizingFlowsPlugin(Plugin):
     """
     .. inheritance-diagram:: synthcity.plugins.generic.plugin_nflow.NormalizingFlowsPlugin
@@ -84,6 +120,14 @@ class NormalizingFlowsPlugin(Plugin):
             Max number of iterations without any improvement before training early stopping is trigged.
         patience_metric: Optional[WeightedMetrics]
             If not None, the metric is used for evaluation the criterion for training early stopping.
+        compile_model: bool
+            Compile the training graph on CUDA devices. Requires PyTorch >= 2.0. Disabled by default, the nflows transforms being captured as many small graphs.
+        mixed_precision: str
+            Mixed precision training mode: "none", "bf16" or "fp16". Only used by the affine transforms.
+        dataloader_kwargs: Optional[dict]
+            Extra arguments for the training `torch.utils.data.DataLoader`, e.g. `num_workers` or `pin_memory`. If set, the dataset is kept on the host and copied to the device per minibatch.
+        sampling_batch_size: int
+            Number of samples generated per batch. On CUDA devices, the batch size used for sampling is doubled after each full batch until the device runs out of memory. The configured value is kept, and the search restarts from it on each fit.
         # Core Plugin arguments
         workspace: Path.
             Optional Path for caching intermediary results.
@@ -131,6 +175,10 @@ class NormalizingFlowsPlugin(Plugin):
         n_iter_print: int = 50,
         patience: int = 5,
         patience_metric: Optional[WeightedMetrics] = None,
+        compile_model: bool = False,
+        mixed_precision: str = "none",  # "none", "bf16", "fp16"
+        dataloader_kwargs: Optional[dict] = None,
+        sampling_batch_size: int = 5000,
         # core plugin arguments
         workspace: Path = Path("workspace"),
         compress_dataset: bool = False,
@@ -148,13 +196,6 @@ class NormalizingFlowsPlugin(Plugin):
             **kwargs,
         )
 
-        if patience_metric is None:
-            patience_metric = WeightedMetrics(
-                metrics=[("detection", "detection_mlp")],
-                weights=[1],
-                workspace=workspace,
-            )
-
         self.n_iter = n_iter
         self.n_layers_hidden = n_layers_hidden
         self.n_units_hidden = n_units_hidden
@@ -178,6 +219,11 @@ class NormalizingFlowsPlugin(Plugin):
         self.n_iter_print = n_iter_print
         self.patience = patience
         self.patience_metric = patience_metric
+        self.compile_model = compile_model
+        self.mixed_precision = mixed_precision
+        self.dataloader_kwargs = dataloader_kwargs
+        self.sampling_batch_size = sampling_batch_size
+        self._reset_sampling_batch_size()
 
     @staticmethod
     def name() -> str:
@@ -189,36 +235,40 @@ class NormalizingFlowsPlugin(Plugin):
 
     @staticmethod
     def hyperparameter_space(**kwargs: Any) -> List[Distribution]:
-        return [
-            IntegerDistribution(name="n_iter", low=100, high=5000, step=100),
-            IntegerDistribution(name="n_layers_hidden", low=1, high=10),
-            IntegerDistribution(name="n_units_hidden", low=10, high=100),
-            CategoricalDistribution(name="batch_size", choices=[32, 64, 128, 256, 512]),
-            FloatDistribution(name="dropout", low=0, high=0.2),
-            CategoricalDistribution(name="batch_norm", choices=[True, False]),
-            CategoricalDistribution(name="lr", choices=[1e-3, 1e-4, 2e-4]),
-            CategoricalDistribution(
-                name="linear_transform_type", choices=["lu", "permutation", "svd"]
-            ),
-            CategoricalDistribution(
-                name="base_transform_type",
-                choices=[
-                    "affine-coupling",
-                    "quadratic-coupling",
-                    "rq-coupling",
-                    "affine-autoregressive",
-                    "quadratic-autoregressive",
-                    "rq-autoregressive",
-                ],
-            ),
-        ]
+        cuda = torch.device(kwargs.get("device", DEVICE)).type == "cuda"
+        return list(_hyperparameter_space(cuda))
+
+    def _get_patience_metric(self) -> Optional[WeightedMetrics]:
+        """Return the metric used for early stopping.
+
+        Unless a metric was provided, the default detection metric is only built if early stopping can trigger within `n_iter` iterations.
+        """
+        if self.patience_metric is not None:
+            return self.patience_metric
+
+        if (
+            self.n_iter <= self.n_iter_min
+            or self.n_iter < (self.patience + 1) * self.n_iter_print
+        ):
+            return None
+
+        return WeightedMetrics(
+            metrics=[("detection", "detection_mlp")],
+            weights=[1],
+            workspace=self.workspace,
+        )
 
     def _fit(
         self, X: DataLoader, *args: Any, **kwargs: Any
     ) -> "NormalizingFlowsPlugin":
+        self._reset_sampling_batch_size()
+        patience_metric = self._get_patience_metric()
+
+        df = X.dataframe()
+
         if self.tabular:
             self.model = TabularFlows(
-                X.dataframe(),
+                df,
                 n_iter=self.n_iter,
                 n_layers_hidden=self.n_layers_hidden,
                 n_units_hidden=self.n_units_hidden,
@@ -237,7 +287,10 @@ class NormalizingFlowsPlugin(Plugin):
                 n_iter_min=self.n_iter_min,
                 n_iter_print=self.n_iter_print,
                 patience=self.patience,
-                patience_metric=self.patience_metric,
+                patience_metric=patience_metric,
+                compile_model=self.compile_model,
+                mixed_precision=self.mixed_precision,
+                dataloader_kwargs=self.dataloader_kwargs,
                 device=self.device,
             )
         else:
@@ -259,36 +312,103 @@ class NormalizingFlowsPlugin(Plugin):
                 n_iter_min=self.n_iter_min,
                 n_iter_print=self.n_iter_print,
                 patience=self.patience,
-                patience_metric=self.patience_metric,
+                patience_metric=patience_metric,
+                compile_model=self.compile_model,
+                mixed_precision=self.mixed_precision,
+                dataloader_kwargs=self.dataloader_kwargs,
                 device=self.device,
             )
 
-        self.model.fit(X.dataframe())
+        self.model.fit(df)
         return self
 
+    def _reset_sampling_batch_size(self) -> None:
+        """Restart the sampling batch size search from the configured value.
+
+        The search only runs on CUDA devices.
+        """
+        self._sampling_batch_size = self.sampling_batch_size
+        self._sampling_batch_size_tuned = torch.device(self.device).type != "cuda"
+
+    def _grow_sampling_batch_size(self, batch: int) -> None:
+        """Double the sampling batch size after a successful full batch, until the search is stopped."""
+        if self._sampling_batch_size_tuned or batch < self._sampling_batch_size:
+            return
+
+        self._sampling_batch_size = 2 * batch
+
+    def _reduce_sampling_batch_size(self, e: Exception, batch: int) -> bool:
+        """Halve the sampling batch size if `e` is an out-of-memory error.
+
+        Returns True if the batch size was reduced, False otherwise.
+        """
+        # Any failure ends the batch size search.
+        self._sampling_batch_size_tuned = True
+
+        if "out of memory" not in str(e).lower() or batch <= 1:
+            return False
+
+        self._sampling_batch_size = batch // 2
+        torch.cuda.empty_cache()
+
+        return True
+
+    def _generate_array(self, count: int) -> np.ndarray:
+        """Sample `count` rows from the flow, without decoding them."""
+        with torch.inference_mode():
+            if self.tabular:
+                return self.model.generate(count, as_numpy=True)
+
+            return self.model.generate(count)
+
+    def _decode_array(self, samples: np.ndarray) -> pd.DataFrame:
+        """Build the output dataframe from the raw flow samples."""
+        if self.tabular:
+            return self.model.decode_samples(samples)
+
+        return pd.DataFrame(samples, columns=self.training_schema().features())
+
     def _generate(self, count: int, syn_schema: Schema, **kwargs: Any) -> pd.DataFrame:
         def _internal_generate(count: int) -> pd.DataFrame:
-            batch = min(5000, count)
+            retries = 0
 
-            result = self.model.generate(1)
+            # Single batch: skip the sampling buffer. A failed attempt falls back
+            # to the batching loop, and counts against the same retries.
+            if count <= self._sampling_batch_size:
+                try:
+                    samples = self._generate_array(count)
+                except (RuntimeError, ValueError) as e:
+                    if not self._reduce_sampling_batch_size(e, count):
+                        retries += 1
+                else:
+                    return self._decode_array(samples)
+
+            batch = self._sampling_batch_size
             max_retries = count / batch + 1
 
-            count -= 1
-            retries = 0
+            out: Optional[np.ndarray] = None
+            filled = 0
 
             while count > 0 and retries < max_retries:
-                batch = min(batch, count)
+                batch = min(self._sampling_batch_size, count)
                 try:
-                    result = pd.concat(
-                        [result, self.model.generate(batch)], ignore_index=True
-                    )
-                except BaseException:
-                    pass
+                    samples = self._generate_array(batch)
+                    if out is None:
+                        out = np.empty(
+                            (filled + count, samples.shape[1]), dtype=samples.dtype
+                        )
+                    out[filled : filled + batch] = samples
+                    filled += batch
+                    count -= batch
+                    self._grow_sampling_batch_size(batch)
+                except (RuntimeError, ValueError) as e:
+                    if not self._reduce_sampling_batch_size(e, batch):
+                        retries += 1
 
-                count -= batch
-                retries += 1
+            if out is None:
+                return pd.DataFrame()
 
-            return result
+            return self._decode_array(out[:filled])
 
         return self._safe_generate(_internal_generate, count, syn_schema)
 
@@ -1,6 +1,8 @@
 # third party
 import pytest
+import torch
 from sklearn.datasets import load_iris
+from torch.utils.data import DataLoader
 
 # synthcity absolute
 from synthcity.plugins.core.models.flows import NormalizingFlows
@@ -16,6 +18,7 @@ def test_nf_sanity() -> None:
         base_distribution="diagonal_normal",
         linear_transform_type="permutation",
         base_transform_type="affine-coupling",
+        compile_model=True,
     )
 
     assert model.n_iter == 1001
@@ -26,6 +29,8 @@ def test_nf_sanity() -> None:
     assert model.linear_transform_type == "permutation"
     assert model.base_transform_type == "affine-coupling"
     assert model.lr == 1e-3
+    assert model.compile_model
+    assert not NormalizingFlows().compile_model
 
 
 @pytest.mark.parametrize("base_distribution", ["standard_normal"])
@@ -62,3 +67,68 @@ def test_nf_fit_generate(
     samples = flow.generate(10)
 
     assert samples.shape == (10, X.shape[1])
+
+
+@pytest.mark.parametrize("mixed_precision", ["none", "bf16", "fp16"])
+@pytest.mark.parametrize(
+    "base_transform_type",
+    [
+        "affine-coupling",
+        "rq-autoregressive",
+    ],
+)
+def test_nf_mixed_precision(mixed_precision: str, base_transform_type: str) -> None:
+    X, _ = load_iris(return_X_y=True)
+
+    flow = NormalizingFlows(
+        n_iter=10,
+        base_transform_type=base_transform_type,
+        mixed_precision=mixed_precision,
+    ).fit(X)
+
+    samples = flow.generate(10)
+
+    assert samples.shape == (10, X.shape[1])
+
+
+def test_nf_mixed_precision_invalid() -> None:
+    with pytest.raises(ValueError):
+        NormalizingFlows(mixed_precision="fp8")
+
+
+def test_nf_dataloader_kwargs() -> None:
+    X, _ = load_iris(return_X_y=True)
+
+    flow = NormalizingFlows(
+        n_iter=10, dataloader_kwargs={"shuffle": True, "num_workers": 1}
+    ).fit(X)
+
+    samples = flow.generate(10)
+
+    assert samples.shape == (10, X.shape[1])
+
+
+def test_nf_dataloader_kwargs_batch_size() -> None:
+    with pytest.raises(ValueError):
+        NormalizingFlows(dataloader_kwargs={"batch_size": 32})
+
+
+def test_nf_dataloader_kwargs_persistent_workers() -> None:
+    X, _ = load_iris(return_X_y=True)
+
+    flow = NormalizingFlows(
+        n_iter=5,
+        dataloader_kwargs={"num_workers": 1, "persistent_workers": True},
+    )
+
+    dataloader = flow.dataloader
+    calls = []
+
+    def counting_dataloader(X: torch.Tensor) -> DataLoader:
+        calls.append(len(X))
+        return dataloader(X)
+
+    flow.dataloader = counting_dataloader
+    flow.fit(X)
+
+    assert len(calls) == 1
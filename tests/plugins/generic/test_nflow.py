@@ -7,6 +7,7 @@ from sklearn.datasets import load_iris
 
 # synthcity absolute
 from synthcity.metrics.eval import PerformanceEvaluatorXGB
+from synthcity.metrics.weighted_metrics import WeightedMetrics
 from synthcity.plugins import Plugin
 from synthcity.plugins.core.constraints import Constraints
 from synthcity.plugins.core.dataloader import GenericDataLoader
@@ -44,6 +45,22 @@ def test_plugin_hyperparams(test_plugin: Plugin) -> None:
     assert len(test_plugin.hyperparameter_space()) == 9
 
 
+@pytest.mark.parametrize("device", ["cpu", "cuda"])
+def test_plugin_hyperparams_device(device: str) -> None:
+    space = {hp.name: hp for hp in plugin.hyperparameter_space(device=device)}
+
+    linear_transform_types = space["linear_transform_type"].choices
+    assert ("svd" in linear_transform_types) == (device == "cpu")
+
+
+def test_plugin_hyperparams_cached() -> None:
+    space = plugin.hyperparameter_space(device="cpu")
+
+    assert space == plugin.hyperparameter_space(device="cpu")
+    assert space[0] is plugin.hyperparameter_space(device="cpu")[0]
+    assert space is not plugin.hyperparameter_space(device="cpu")
+
+
 @pytest.mark.parametrize(
     "test_plugin", generate_fixtures(plugin_name, plugin, plugin_args)
 )
@@ -52,6 +69,15 @@ def test_plugin_fit(test_plugin: Plugin) -> None:
     test_plugin.fit(GenericDataLoader(X))
 
 
+def test_plugin_patience_metric() -> None:
+    assert plugin(n_iter=10)._get_patience_metric() is None
+    assert plugin(n_iter=1000)._get_patience_metric() is not None
+
+    metric = WeightedMetrics(metrics=[("detection", "detection_xgb")], weights=[1])
+    test_plugin = plugin(n_iter=10, patience_metric=metric)
+    assert test_plugin._get_patience_metric() is metric
+
+
 def test_plugin_generate() -> None:
     test_plugin = plugin(n_layers_hidden=2, n_units_hidden=100, n_iter=50)
     X = pd.DataFrame(load_iris()["data"])
@@ -66,6 +92,132 @@ def test_plugin_generate() -> None:
     assert test_plugin.schema_includes(X_gen)
 
 
+def test_plugin_generate_batched() -> None:
+    test_plugin = plugin(n_iter=10, sampling_batch_size=16)
+    X = pd.DataFrame(load_iris()["data"])
+    test_plugin.fit(GenericDataLoader(X))
+
+    X_gen = test_plugin.generate(50)
+    assert len(X_gen) == 50
+    assert test_plugin.schema_includes(X_gen)
+
+
+def test_plugin_generate_retries() -> None:
+    test_plugin = plugin(n_iter=10, sampling_batch_size=16)
+    X = pd.DataFrame(load_iris()["data"])
+    test_plugin.fit(GenericDataLoader(X))
+
+    generate_array = test_plugin._generate_array
+    calls = []
+
+    def flaky_generate_array(count: int) -> np.ndarray:
+        calls.append(count)
+        if len(calls) % 2 == 1:
+            raise RuntimeError("flaky generator")
+        return generate_array(count)
+
+    test_plugin._generate_array = flaky_generate_array
+
+    X_gen = test_plugin.generate(50)
+    assert len(X_gen) == 50
+    assert calls[:8] == [16, 16, 16, 16, 16, 16, 2, 2]
+
+
+def test_plugin_generate_single_batch_retries() -> None:
+    test_plugin = plugin(n_iter=10, sampling_batch_size=64)
+    X = pd.DataFrame(load_iris()["data"])
+    test_plugin.fit(GenericDataLoader(X))
+
+    generate_array = test_plugin._generate_array
+    calls = []
+
+    def flaky_generate_array(count: int) -> np.ndarray:
+        calls.append(count)
+        if len(calls) == 1:
+            raise RuntimeError("flaky generator")
+        return generate_array(count)
+
+    test_plugin._generate_array = flaky_generate_array
+
+    X_gen = test_plugin.generate(50)
+    assert len(X_gen) == 50
+    assert calls == [50, 50]
+
+
+@pytest.mark.parametrize("count", [10, 100])
+def test_plugin_generate_decode_error(count: int) -> None:
+    test_plugin = plugin(n_iter=10, sampling_batch_size=64)
+    X = pd.DataFrame(load_iris()["data"])
+    test_plugin.fit(GenericDataLoader(X))
+
+    def broken_decode_array(samples: np.ndarray) -> pd.DataFrame:
+        raise ValueError("broken decoder")
+
+    test_plugin._decode_array = broken_decode_array
+
+    with pytest.raises(ValueError):
+        test_plugin.generate(count)
+
+
+def test_plugin_generate_out_of_memory() -> None:
+    test_plugin = plugin(n_iter=10, sampling_batch_size=32)
+    X = pd.DataFrame(load_iris()["data"])
+    test_plugin.fit(GenericDataLoader(X))
+
+    generate_array = test_plugin._generate_array
+
+    def oom_generate_array(count: int) -> np.ndarray:
+        if count > 8:
+            raise RuntimeError("CUDA out of memory")
+        return generate_array(count)
+
+    test_plugin._generate_array = oom_generate_array
+
+    X_gen = test_plugin.generate(50)
+    assert len(X_gen) == 50
+    assert test_plugin._sampling_batch_size == 8
+    assert test_plugin.sampling_batch_size == 32
+
+    test_plugin.fit(GenericDataLoader(X))
+    assert test_plugin._sampling_batch_size == 32
+
+
+def test_plugin_generate_batch_size_search() -> None:
+    test_plugin = plugin(n_iter=10, sampling_batch_size=16)
+    X = pd.DataFrame(load_iris()["data"])
+    test_plugin.fit(GenericDataLoader(X))
+
+    # Run the CUDA batch size search on the current device.
+    test_plugin._sampling_batch_size_tuned = False
+
+    generate_array = test_plugin._generate_array
+    calls = []
+
+    def oom_generate_array(count: int) -> np.ndarray:
+        calls.append(count)
+        if count > 32:
+            raise RuntimeError("CUDA out of memory")
+        return generate_array(count)
+
+    test_plugin._generate_array = oom_generate_array
+
+    X_gen = test_plugin.generate(100)
+    assert len(X_gen) == 100
+    assert calls == [16, 32, 52, 26, 26]
+    assert test_plugin._sampling_batch_size == 26
+    assert test_plugin.sampling_batch_size == 16
+
+
+def test_plugin_generate_not_tabular() -> None:
+    test_plugin = plugin(n_iter=10, tabular=False, strict=False)
+    X = pd.DataFrame(load_iris()["data"])
+    test_plugin.fit(GenericDataLoader(X))
+
+    X_gen = test_plugin.generate(50).dataframe()
+    assert len(X_gen) == 50
+    assert list(X_gen.columns) == list(X.columns)
+
+
 def test_plugin_generate_constraints() -> None:
     test_plugin = plugin(n_layers_hidden=2, n_units_hidden=100, n_iter=50)
     X = pd.DataFrame(load_iris()["data"])